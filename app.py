@@ -13,9 +13,13 @@ The script uses the following libraries:
 - `file_reader` for reading the content of various file types.
 - `dropbox_reader` for interacting with Dropbox.
 - `langflow_api` for running the flow and extracting scores.
+- `profiler` for optionally profiling file processing.
 - `scoreboard` for displaying the scoreboard.
 
 Functions:
+- `judge_file(file_name, content, stream, profile_tags)`: Runs the flow on a file and displays
+  its scores.
+- `display_profile_summary()`: Displays the files that were slowest or most memory-hungry.
 - `get_score(score)`: Helper function to extract the numeric score from a score string.
 
 Example usage:
@@ -34,7 +38,8 @@ from dropbox_reader import (
     download_dropbox_file,
     DROPBOX_AUTHENTICATED
 )
-from langflow_api import run_flow, extract_scores
+from langflow_api import run_flow, stream_flow, extract_scores, STREAM_FLOW
+from profiler import profile, profile_iter, load_profile_summary, worst_files, PROFILE_ENABLED
 from scoreboard import display_scoreboard
 
 # Configure logger
@@ -82,9 +87,63 @@ if DROPBOX_AUTHENTICATED:
 # Option to choose file source
 file_source = st.radio("Choose file source", file_source_options)
 
+# Option to stream results as the judge produces them
+stream_results = st.toggle("Stream results", value=STREAM_FLOW)
+
+# Option to profile reading, downloading and judging of each file
+profile_processing = st.toggle("Profile processing", value=PROFILE_ENABLED)
+
 # Create a placeholder for the progress bar
 progress_bar = st.progress(0)
 
+
+def judge_file(file_name, content, stream, profile_tags):
+    """
+    Run the flow on a file's content and display its scores.
+
+    In streaming mode the final score and score detail are rendered into placeholders
+    and refreshed as each partial result arrives from the flow.
+
+    Args:
+        file_name (str): The name of the file being judged.
+        content (str): The content of the file.
+        stream (bool): Whether to stream the results from the flow.
+        profile_tags (tuple): The file name, size and type to tag the flow run's profile
+            with, used when profiling is enabled.
+
+    Returns:
+        str: The final score of the file.
+    """
+    # Display file name and page title as section headers with color coding
+    st.markdown(
+        f"<h2 id='{file_name}' style='color:#00ffff;'>File: {file_name}</h2>",
+        unsafe_allow_html=True
+    )
+    final_score_placeholder = st.empty()
+    st.markdown("<h3 style='color:#ff00ff;'>Score Detail</h3>", unsafe_allow_html=True)
+    score_detail_placeholder = st.empty()
+
+    # Profile only the flow run, not the rendering of its results
+    if stream:
+        results = profile_iter(stream_flow(content), "run_flow", *profile_tags,
+                               enabled=profile_processing)
+    else:
+        with profile("run_flow", *profile_tags, enabled=profile_processing):
+            response = run_flow(content)
+        results = [extract_scores(response)]
+
+    final_score, score_detail = "N/A", {}
+    for final_score, score_detail in results:
+        final_score_placeholder.markdown(
+            f"<h3 style='color:#ff00ff;'>Final Score: {final_score}</h3>",
+            unsafe_allow_html=True
+        )
+        score_detail_placeholder.markdown(
+            "\n\n".join(f"**{key}**: {value}" for key, value in score_detail.items())
+        )
+    return final_score
+
+
 if file_source == "Local":
     uploaded_files = st.file_uploader("Choose a file",
                                       type=["docx", "pdf", "txt", "md"],
@@ -95,33 +154,17 @@ if file_source == "Local":
         for i, uploaded_file in enumerate(uploaded_files):
             if uploaded_file is not None:
                 file_type = uploaded_file.name.split('.')[-1]
+                profile_tags = (uploaded_file.name, uploaded_file.size, file_type)
 
                 with st.spinner(f"Reading {uploaded_file.name}..."):
-                    content = read_file(uploaded_file, file_type)
-                    response = run_flow(content)
-
-                # Extract and display scores
-                final_score, score_detail = extract_scores(response)
+                    with profile("read_file", *profile_tags, enabled=profile_processing):
+                        content = read_file(uploaded_file, file_type)
+                    final_score = judge_file(uploaded_file.name, content, stream_results,
+                                             profile_tags)
 
                 # Add to scoreboard
                 scoreboard.append((uploaded_file.name, final_score))
 
-                # Display file name and page title as section headers with color coding
-                st.markdown(
-                    f"<h2 id='{uploaded_file.name}' style='color:#00ffff;'>"
-                    f"File: {uploaded_file.name}</h2>",
-                    unsafe_allow_html=True
-                )
-                st.markdown(
-                    f"<h3 style='color:#ff00ff;'>Final Score: {final_score}</h3>",
-                    unsafe_allow_html=True
-                )
-
-                # Display Score Detail
-                st.markdown("<h3 style='color:#ff00ff;'>Score Detail</h3>", unsafe_allow_html=True)
-                for key, value in score_detail.items():
-                    st.markdown(f"**{key}**: {value}")
-
                 # Update progress bar
                 progress_bar.progress((i + 1) / total_files)
         ALL_DOCUMENTS_PROCESSED = True
@@ -139,38 +182,24 @@ elif file_source == "Dropbox":
                 total_files = len(selected_files)
                 for i, file_name in enumerate(selected_files):
                     file_path = file_map[file_name]
-                    file_content = download_dropbox_file(file_path)
+                    file_type = file_name.split('.')[-1]
+                    with profile("download_dropbox_file", file_name, file_type=file_type,
+                                 enabled=profile_processing) as profile_record:
+                        file_content = download_dropbox_file(file_path)
+                        if profile_record is not None and file_content:
+                            profile_record["file_size"] = file_content.getbuffer().nbytes
                     if file_content:
-                        file_type = file_name.split('.')[-1]
+                        profile_tags = (file_name, file_content.getbuffer().nbytes, file_type)
 
                         with st.spinner(f"Reading {file_name}..."):
-                            content = read_file(file_content, file_type)
-                            response = run_flow(content)
-
-                        # Extract and display scores
-                        final_score, score_detail = extract_scores(response)
+                            with profile("read_file", *profile_tags, enabled=profile_processing):
+                                content = read_file(file_content, file_type)
+                            final_score = judge_file(file_name, content, stream_results,
+                                                     profile_tags)
 
                         # Add to scoreboard
                         scoreboard.append((file_name, final_score))
 
-                        # Display file name and page title as section headers with color coding
-                        st.markdown(
-                            f"<h2 id='{file_name}' style='color:#00ffff;'>File: {file_name}</h2>", 
-                            unsafe_allow_html=True
-                        )
-                        st.markdown(
-                            f"<h3 style='color:#ff00ff;'>Final Score: {final_score}</h3>", 
-                            unsafe_allow_html=True
-                        )
-
-                        # Display Score Detail
-                        st.markdown(
-                            "<h3 style='color:#ff00ff;'>Score Detail</h3>", 
-                            unsafe_allow_html=True
-                        )
-                        for key, value in score_detail.items():
-                            st.markdown(f"**{key}**: {value}")
-
                         # Update progress bar
                         progress_bar.progress((i + 1) / total_files)
                 ALL_DOCUMENTS_PROCESSED = True
@@ -182,6 +211,25 @@ elif file_source == "Dropbox":
         st.stop()  # Stop further execution
 
 
+@st.fragment
+def display_profile_summary():
+    """
+    Display the files that were slowest or most memory-hungry to process.
+
+    This runs as a fragment so that changing the number of files shown only reruns
+    the summary, rather than reading and judging every file again.
+    """
+    with st.expander("Profiling summary"):
+        worst_n = st.number_input("Files to show", min_value=1, value=10)
+        profile_records = load_profile_summary()
+        for title, key in (("CPU time", "cpu_time"), ("Peak allocation", "peak_memory")):
+            st.markdown(f"**Worst files by {title}**")
+            st.dataframe([
+                {**entry, "stages": ", ".join(entry["stages"])}
+                for entry in worst_files(profile_records, worst_n, key)
+            ])
+
+
 # Sort scoreboard by final score in descending order
 def get_score(score):
     """
@@ -221,3 +269,7 @@ with st.sidebar:
     st.caption("Powered by DataStax Langflow and Streamlit.io")
 
     display_scoreboard(scoreboard)
+
+    # Display the files that were slowest or most memory-hungry to process
+    if profile_processing:
+        display_profile_summary()
@@ -17,21 +17,30 @@ Environment Variables:
     - FLOW_ID: The Flow ID.
     - APPLICATION_TOKEN: The Langflow application token for authorization.
     - ENDPOINT: The named endpoint for the API call.
+    - STREAM_FLOW: Set to "true" to stream flow results by default.
 
 Functions:
     - run_flow(message: str) -> dict:
         Runs the flow with the given message and returns the judge output component from the flow response.
+    - stream_flow(message: str) -> Iterator[tuple]:
+        Runs the flow in streaming mode and yields partial scores as the judge output arrives.
     - extract_scores(judge_output: dict) -> tuple:
         Extracts scores from the "Judge Output" component.
+    - parse_partial_scores(text: str) -> tuple:
+        Extracts whatever scores are complete from a partially received judge output.
 
 Usage:
     Ensure that the environment variables are set in a .env file.
     Call the run_flow function with the desired message to run the flow and get the judge output.
     Use the extract_scores function to extract the final score and score detail from the judge output.
+    Alternatively, iterate over stream_flow to receive the scores progressively; the last
+    tuple yielded is the final result.
 """
 import logging
 import os
+import re
 import json
+from typing import Iterator
 import requests
 import coloredlogs
 from dotenv import load_dotenv
@@ -45,6 +54,17 @@ LANGFLOW_ID = os.getenv("LANGFLOW_ID")
 FLOW_ID = os.getenv("FLOW_ID")
 APPLICATION_TOKEN = os.getenv("APPLICATION_TOKEN")
 ENDPOINT = os.getenv("ENDPOINT")
+STREAM_FLOW = os.getenv("STREAM_FLOW", "false").lower() in ("1", "true", "yes")
+
+# Patterns used to pick complete fields out of a partially streamed judge output
+FINAL_SCORE_PATTERN = re.compile(
+    r'"Final Score"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?)\s*[,}]'
+)
+SCORE_DETAIL_PATTERN = re.compile(r'"Score Detail"\s*:\s*\{')
+SEPARATOR_PATTERN = re.compile(r'\s*,?\s*')
+COLON_PATTERN = re.compile(r'\s*:\s*')
+VALUE_END_PATTERN = re.compile(r'\s*[,}]')
+CODE_FENCE_PATTERN = re.compile(r'^```[A-Za-z]*\s*|\s*```$')
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -65,19 +85,7 @@ def run_flow(message: str) -> dict:
     Returns:
         dict: The judge output component from the flow response.
     """
-    if LANGFLOW_ID:
-        api_url = f"{BASE_API_URL}/lf/{LANGFLOW_ID}/api/v1/run/{ENDPOINT or FLOW_ID}"
-    else:
-        api_url = f"{BASE_API_URL}/api/v1/run/{ENDPOINT or FLOW_ID}"
-    payload = {
-        "input_value": message,
-        "output_type": "chat",
-        "input_type": "chat",
-    }
-    if APPLICATION_TOKEN:
-        headers = {"Authorization": "Bearer " + APPLICATION_TOKEN, "Content-Type": "application/json"}
-    else:
-        headers = None
+    api_url, payload, headers = _build_request(message)
 
     # Log the API call
     logger.info("API call made to: %s", api_url)
@@ -96,6 +104,168 @@ def run_flow(message: str) -> dict:
         logger.error("RequestException: %s", e)
         raise
 
+    return _extract_judge_output(response_json)
+
+def stream_flow(message: str) -> Iterator[tuple]:
+    """
+    Run the flow in streaming mode and yield scores as they arrive.
+
+    Token chunks of the "Judge Output" message are parsed incrementally so the final
+    score can be shown as soon as its field is complete, with score detail entries
+    added as each one closes. Tokens are only streamed when the Judge Output is fed
+    directly by a model with streaming enabled; otherwise the scores arrive in one
+    piece when the flow finishes.
+
+    Once the flow has finished, its judge output is used even if it holds no scores.
+    If the stream breaks off before that, the judge output received so far is used.
+    The blocking run_flow path is only used when the stream broke off before any
+    judge output arrived.
+
+    Args:
+        message (str): The input message to be processed by the flow.
+
+    Yields:
+        tuple: A tuple containing the final score and score detail received so far.
+            The last tuple yielded is the final result.
+    """
+    api_url, payload, headers = _build_request(message)
+
+    # Log the API call
+    logger.info("Streaming API call made to: %s", api_url)
+
+    judge_message_id = None
+    judge_text = ""
+    last_scores = None
+    flow_ended = False
+    try:
+        with requests.post(api_url, json=payload, headers=headers,
+                           params={"stream": "true"}, stream=True, timeout=90) as response:
+            response.raise_for_status()
+
+            # Servers without streaming support answer with the regular run response
+            if "text/event-stream" not in response.headers.get("Content-Type", ""):
+                logger.warning("Streaming not supported by the server, using blocking response")
+                yield extract_scores(_extract_judge_output(response.json()))
+                return
+
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                if line.startswith("data:"):
+                    line = line[len("data:"):]
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.debug("Skipping malformed stream line: %s", line)
+                    continue
+
+                event_type = event.get("event")
+                data = event.get("data") or {}
+                if event_type == "token":
+                    if judge_message_id is None or data.get("id") != judge_message_id:
+                        continue
+                    judge_text += data.get("chunk", "")
+                elif event_type == "add_message":
+                    source = data.get("properties", {}).get("source", {}) or {}
+                    if source.get("display_name") != "Judge Output":
+                        continue
+                    judge_message_id = data.get("id")
+                    judge_text = data.get("text") or judge_text
+                elif event_type == "end":
+                    flow_ended = True
+                    judge_output = _extract_judge_output(data.get("result", {}))
+                    if judge_output.get('component_display_name') == "Judge Output":
+                        logger.info("Judge Output component streamed")
+                        judge_text = judge_output['results']['message'].get('text') or judge_text
+                    else:
+                        logger.warning("Flow finished without a Judge Output component")
+                    break
+                elif event_type == "error":
+                    logger.error("Stream error event: %s", data)
+                    break
+                else:
+                    continue
+
+                scores = _new_scores(judge_text, last_scores)
+                if scores:
+                    last_scores = scores
+                    yield scores
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error("Streaming failed: %s", e)
+
+    # The flow finished, so running it again would not produce a different judge output
+    if flow_ended:
+        scores = parse_partial_scores(judge_text) if judge_text else ("N/A", {})
+        if _parse_judge_json(judge_text) is None:
+            logger.warning("Judge output is not valid score JSON: %s", judge_text)
+        if scores != last_scores:
+            yield scores
+        return
+
+    # Use whatever the stream delivered before falling back to a second flow run
+    if judge_text:
+        logger.warning("Stream broke off before the flow finished")
+        scores = _new_scores(judge_text, last_scores)
+        if scores:
+            yield scores
+        if scores or last_scores:
+            return
+
+    # Fall back to the blocking path when the stream did not deliver a judge output
+    logger.warning("Falling back to blocking flow run")
+    yield extract_scores(run_flow(message))
+
+def _new_scores(judge_text: str, last_scores: tuple):
+    """
+    Parse the judge output received so far and return the scores if they changed.
+
+    Args:
+        judge_text (str): The judge output text received so far.
+        last_scores (tuple): The scores that were last yielded, if any.
+
+    Returns:
+        tuple: The new final score and score detail, or None if nothing changed.
+    """
+    scores = parse_partial_scores(judge_text)
+    if scores == last_scores or scores == ("N/A", {}):
+        return None
+    return scores
+
+def _build_request(message: str) -> tuple:
+    """
+    Build the API URL, payload and headers for a flow run.
+
+    Args:
+        message (str): The input message to be processed by the flow.
+
+    Returns:
+        tuple: A tuple containing the API URL, payload and headers.
+    """
+    if LANGFLOW_ID:
+        api_url = f"{BASE_API_URL}/lf/{LANGFLOW_ID}/api/v1/run/{ENDPOINT or FLOW_ID}"
+    else:
+        api_url = f"{BASE_API_URL}/api/v1/run/{ENDPOINT or FLOW_ID}"
+    payload = {
+        "input_value": message,
+        "output_type": "chat",
+        "input_type": "chat",
+    }
+    if APPLICATION_TOKEN:
+        headers = {"Authorization": "Bearer " + APPLICATION_TOKEN, "Content-Type": "application/json"}
+    else:
+        headers = None
+    return api_url, payload, headers
+
+def _extract_judge_output(response_json: dict) -> dict:
+    """
+    Extract the "Judge Output" component from a flow run response.
+
+    Args:
+        response_json (dict): The decoded flow run response.
+
+    Returns:
+        dict: The judge output component, or a placeholder if it is missing.
+    """
     # Initialize default values
     judge_output = {
         'component_display_name': 'N/A',
@@ -133,11 +303,69 @@ def extract_scores(judge_output):
         tuple: A tuple containing the final score and score detail.
     """
     results = judge_output.get('results', {}).get('message', {}).get('text', 'N/A')
+    results_json = _parse_judge_json(results)
+    if results_json is None:
+        return "N/A", {}
+    return results_json.get("Final Score", "N/A"), results_json.get("Score Detail", {})
+
+def _parse_judge_json(text):
+    """
+    Parse a complete judge output, ignoring a surrounding Markdown code fence.
+
+    Args:
+        text (str): The judge output text.
+
+    Returns:
+        dict: The parsed judge output, or None if it is not a complete JSON object.
+    """
+    text = CODE_FENCE_PATTERN.sub('', text.strip())
     try:
-        results_json = json.loads(results)
-        final_score = results_json.get("Final Score", "N/A")
-        score_detail = results_json.get("Score Detail", {})
+        results_json = json.loads(text)
     except json.JSONDecodeError:
-        final_score = "N/A"
-        score_detail = {}
+        return None
+    return results_json if isinstance(results_json, dict) else None
+
+def parse_partial_scores(text):
+    """
+    Extract the scores that are complete in a partially received judge output.
+
+    Only fields whose values have been closed off are returned, so a number that is
+    still being streamed (e.g. "8" of "85") is never reported early.
+
+    Args:
+        text (str): The judge output text received so far.
+
+    Returns:
+        tuple: A tuple containing the final score and score detail received so far.
+    """
+    results_json = _parse_judge_json(text)
+    if results_json is not None:
+        return results_json.get("Final Score", "N/A"), results_json.get("Score Detail", {})
+
+    final_score = "N/A"
+    match = FINAL_SCORE_PATTERN.search(text)
+    if match:
+        final_score = json.loads(match.group(1))
+
+    score_detail = {}
+    match = SCORE_DETAIL_PATTERN.search(text)
+    if match:
+        decoder = json.JSONDecoder()
+        pos = match.end()
+        while True:
+            pos = SEPARATOR_PATTERN.match(text, pos).end()
+            try:
+                key, pos = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                break
+            colon = COLON_PATTERN.match(text, pos)
+            if not isinstance(key, str) or not colon:
+                break
+            try:
+                value, pos = decoder.raw_decode(text, colon.end())
+            except json.JSONDecodeError:
+                break
+            if not VALUE_END_PATTERN.match(text, pos):
+                break
+            score_detail[key] = value
     return final_score, score_detail
@@ -0,0 +1,297 @@
+"""
+This script provides opt-in profiling of the ingest and judging hot paths.
+
+When profiling is enabled, each profiled call is run under `cProfile` and `tracemalloc`.
+Profiled calls are serialized, as `tracemalloc` measures the memory of the whole process.
+The results are written to the profiles directory, tagged with the file name, size and type:
+1. A `.prof` file with the raw cProfile stats, loadable with `pstats` or snakeviz.
+2. A `.txt` report with the top functions by cumulative time and the top allocations.
+3. A line in `summary.jsonl` with the CPU time, wall time and peak allocation of the call.
+
+The script uses the following libraries:
+- `cProfile` and `pstats` for CPU profiling.
+- `tracemalloc` for tracking memory allocations.
+- `coloredlogs` for enhanced logging.
+- `dotenv` for loading environment variables from a .env file.
+
+Environment Variables:
+- PROFILE: Set to "true" to enable profiling by default.
+- PROFILES_DIR: The directory profiles are written to (defaults to "profiles").
+
+Functions:
+- `profile(stage, file_name, file_size, file_type, enabled)`: Context manager that profiles a block.
+- `profile_iter(iterable, stage, file_name, file_size, file_type, enabled)`: Profiles the
+  production of each item of an iterable, such as a streamed flow run.
+- `load_profile_summary(profiles_dir)`: Loads the summary records of all profiled calls.
+- `worst_files(records, n, key)`: Returns the worst N files by CPU time or peak allocation.
+
+Example usage:
+    with profile("read_file", "log.pdf", 1024, "pdf") as record:
+        content = read_file(uploaded_file, "pdf")
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+import coloredlogs
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+PROFILE_ENABLED = os.getenv("PROFILE", "false").lower() in ("1", "true", "yes")
+PROFILES_DIR = os.getenv("PROFILES_DIR", "profiles")
+SUMMARY_FILE = "summary.jsonl"
+
+# tracemalloc traces memory for the whole process, but Streamlit runs each session in
+# its own thread, so profiled calls are serialized to keep their measurements apart
+_PROFILE_LOCK = threading.RLock()
+
+# Leave the profiler's own allocations out of the allocation report
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+# Number of entries to include in the text report
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 10
+
+# Configure logger
+logger = logging.getLogger(__name__)
+coloredlogs.install(level='DEBUG', logger=logger)
+
+class _ProfileSession:
+    """
+    The cProfile and tracemalloc state of one profiled call.
+
+    A session can be resumed and paused several times, so that only the profiled
+    code is measured and not the code that runs in between.
+    """
+
+    def __init__(self, record):
+        self.record = record
+        self.record.update(cpu_time=0.0, wall_time=0.0, peak_memory=0)
+        self.profiler = cProfile.Profile()
+        self.retained_memory = 0
+        self.was_tracing = tracemalloc.is_tracing()
+        if not self.was_tracing:
+            tracemalloc.start()
+
+    def resume(self):
+        """Start measuring the profiled code."""
+        tracemalloc.reset_peak()
+        self.start_memory = tracemalloc.get_traced_memory()[0]
+        self.start_cpu = time.process_time()
+        self.start_wall = time.perf_counter()
+        self.profiler.enable()
+
+    def pause(self):
+        """Stop measuring the profiled code."""
+        self.profiler.disable()
+        self.record["cpu_time"] += time.process_time() - self.start_cpu
+        self.record["wall_time"] += time.perf_counter() - self.start_wall
+        current, peak = tracemalloc.get_traced_memory()
+        self.record["peak_memory"] = max(self.record["peak_memory"],
+                                         self.retained_memory + peak - self.start_memory)
+        self.retained_memory += current - self.start_memory
+
+    def finish(self):
+        """Stop tracing and write the profile."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        if not self.was_tracing:
+            tracemalloc.stop()
+        try:
+            _write_profile(self.record, self.profiler, snapshot)
+        except OSError as e:
+            logger.error("Error writing profile: %s", e)
+
+@contextmanager
+def profile(stage, file_name, file_size=None, file_type=None, enabled=PROFILE_ENABLED):
+    """
+    Profile the CPU time and memory allocations of a block.
+
+    The yielded record can be updated inside the block, e.g. to set the file size
+    once a download has completed.
+
+    Args:
+        stage (str): The name of the profiled call, e.g. "read_file".
+        file_name (str): The name of the file being processed.
+        file_size (int): The size of the file in bytes, if known.
+        file_type (str): The type of the file, e.g. "pdf".
+        enabled (bool): Whether profiling is enabled.
+
+    Yields:
+        dict: The summary record of the call, or None if profiling is disabled.
+    """
+    if not enabled:
+        yield None
+        return
+
+    record = {
+        "stage": stage,
+        "file_name": file_name,
+        "file_size": file_size,
+        "file_type": file_type,
+    }
+    with _PROFILE_LOCK:
+        session = _ProfileSession(record)
+        session.resume()
+        try:
+            yield record
+        finally:
+            session.pause()
+            session.finish()
+
+def profile_iter(iterable, stage, file_name, file_size=None, file_type=None,
+                 enabled=PROFILE_ENABLED):
+    """
+    Profile the production of each item of an iterable, e.g. a streamed flow run.
+
+    Only the time spent producing items is measured, not the code consuming them.
+
+    Args:
+        iterable (iterable): The iterable to profile.
+        stage (str): The name of the profiled call, e.g. "run_flow".
+        file_name (str): The name of the file being processed.
+        file_size (int): The size of the file in bytes, if known.
+        file_type (str): The type of the file, e.g. "pdf".
+        enabled (bool): Whether profiling is enabled.
+
+    Yields:
+        The items of the iterable.
+    """
+    if not enabled:
+        yield from iterable
+        return
+
+    record = {
+        "stage": stage,
+        "file_name": file_name,
+        "file_size": file_size,
+        "file_type": file_type,
+    }
+    with _PROFILE_LOCK:
+        session = _ProfileSession(record)
+        iterator = iter(iterable)
+        try:
+            while True:
+                session.resume()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    session.pause()
+                yield item
+        finally:
+            session.finish()
+
+def _write_profile(record, profiler, snapshot):
+    """Write the stats, report and summary record of a profiled call."""
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+
+    # Tag the output files with the file name, size and type
+    safe_name = re.sub(r'[^A-Za-z0-9._-]+', '_', record["file_name"])
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    base_name = (f"{timestamp}_{record['stage']}_{safe_name}_"
+                 f"{record['file_size'] or 0}B_{record['file_type'] or 'unknown'}")
+    prof_path = os.path.join(PROFILES_DIR, base_name + ".prof")
+    report_path = os.path.join(PROFILES_DIR, base_name + ".txt")
+
+    profiler.dump_stats(prof_path)
+
+    top_allocations = [str(stat) for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]]
+    record["top_allocations"] = top_allocations
+    record["profile_path"] = prof_path
+    record["report_path"] = report_path
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+    with open(report_path, "w", encoding="utf-8") as report:
+        report.write(f"Stage: {record['stage']}\n")
+        report.write(f"File: {record['file_name']} ({record['file_size']} bytes, "
+                     f"{record['file_type']})\n")
+        report.write(f"CPU time: {record['cpu_time']:.3f} s\n")
+        report.write(f"Wall time: {record['wall_time']:.3f} s\n")
+        report.write(f"Peak allocation: {record['peak_memory']} bytes\n\n")
+        report.write("Top allocations:\n")
+        report.write("\n".join(top_allocations) + "\n\n")
+        report.write(stream.getvalue())
+
+    with open(os.path.join(PROFILES_DIR, SUMMARY_FILE), "a", encoding="utf-8") as summary:
+        summary.write(json.dumps(record) + "\n")
+
+    logger.info("Profiled %s of %s: %.3f s CPU, %d bytes peak",
+                record["stage"], record["file_name"], record["cpu_time"], record["peak_memory"])
+
+def load_profile_summary(profiles_dir=PROFILES_DIR):
+    """
+    Load the summary records of all profiled calls.
+
+    Args:
+        profiles_dir (str): The directory profiles are written to.
+
+    Returns:
+        list: A list of summary records, one per profiled call.
+    """
+    records = []
+    summary_path = os.path.join(profiles_dir, SUMMARY_FILE)
+    if not os.path.exists(summary_path):
+        return records
+    with open(summary_path, encoding="utf-8") as summary:
+        for line in summary:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.debug("Skipping malformed summary line: %s", line)
+    return records
+
+def worst_files(records, n=10, key="cpu_time"):
+    """
+    Return the worst N files by CPU time or peak allocation.
+
+    Only the latest record of each stage of a file is used, as the summary grows each
+    time a file is processed again. The stages of each file are then combined: CPU and
+    wall times are summed and the peak allocation is the largest peak of any stage.
+
+    Args:
+        records (list): The summary records of the profiled calls, oldest first.
+        n (int): The number of files to return.
+        key (str): The field to rank by, either "cpu_time" or "peak_memory".
+
+    Returns:
+        list: A list of per-file dictionaries, worst first.
+    """
+    latest = {}
+    for record in records:
+        latest[(record["file_name"], record["stage"])] = record
+
+    files = {}
+    for record in latest.values():
+        entry = files.setdefault(record["file_name"], {
+            "file_name": record["file_name"],
+            "file_size": None,
+            "file_type": None,
+            "cpu_time": 0.0,
+            "wall_time": 0.0,
+            "peak_memory": 0,
+            "stages": [],
+        })
+        entry["file_size"] = record.get("file_size") or entry["file_size"]
+        entry["file_type"] = record.get("file_type") or entry["file_type"]
+        entry["cpu_time"] += record.get("cpu_time", 0.0)
+        entry["wall_time"] += record.get("wall_time", 0.0)
+        entry["peak_memory"] = max(entry["peak_memory"], record.get("peak_memory", 0))
+        entry["stages"].append(record["stage"])
+    return sorted(files.values(), key=lambda entry: entry[key], reverse=True)[:n]
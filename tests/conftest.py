@@ -0,0 +1,99 @@
+"""
+Shared fixtures for the tests.
+
+Provides a stand-in for the Langflow run endpoint that emits a streamed run as
+Server-Sent Events, so stream_flow can be tested without a Langflow server.
+"""
+import json
+import os
+import sys
+import pytest
+
+# Make the application modules importable from the tests
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import langflow_api  # pylint: disable=wrong-import-position
+
+
+class FakeStreamResponse:
+    """A streamed response from the Langflow run endpoint."""
+
+    def __init__(self, lines, content_type="text/event-stream", body=None, fail_after=None):
+        self.lines = lines
+        self.headers = {"Content-Type": content_type}
+        self.body = body
+        self.fail_after = fail_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        """Never fails; errors are emitted in the stream."""
+
+    def json(self):
+        """Return the regular run response."""
+        return self.body
+
+    def iter_lines(self, decode_unicode=False):
+        """Yield the event lines, optionally dropping the connection part way."""
+        for index, line in enumerate(self.lines):
+            if self.fail_after is not None and index >= self.fail_after:
+                raise langflow_api.requests.exceptions.ChunkedEncodingError("Connection broken")
+            yield line
+
+
+def sse(event, data):
+    """Encode a Langflow stream event as the lines sent for it."""
+    return [f"data: {json.dumps({'event': event, 'data': data})}", ""]
+
+
+def judge_message(text="", message_id="judge-1"):
+    """Build the add_message event data of the Judge Output component."""
+    return {
+        "id": message_id,
+        "text": text,
+        "properties": {"source": {"id": "ChatOutput-8nVwe", "display_name": "Judge Output"}},
+    }
+
+
+def run_result(text):
+    """Build a run response whose Judge Output contains the given text."""
+    return {
+        "outputs": [{
+            "outputs": [{
+                "component_display_name": "Judge Output",
+                "results": {"message": {"text": text}},
+            }]
+        }]
+    }
+
+
+@pytest.fixture
+def langflow_server(monkeypatch):
+    """
+    Replace the Langflow run endpoint with a stand-in.
+
+    Returns a function that takes the events to emit and returns a record of the
+    calls made, including how often the blocking run_flow fallback was used.
+    """
+    calls = {"stream": [], "run_flow": 0}
+
+    def serve(events=(), **response_kwargs):
+        lines = [line for event, data in events for line in sse(event, data)]
+
+        def fake_post(*args, **kwargs):
+            calls["stream"].append(kwargs)
+            return FakeStreamResponse(lines, **response_kwargs)
+
+        def fake_run_flow(message):
+            calls["run_flow"] += 1
+            return run_result('{"Final Score": "1/100", "Score Detail": {}}')["outputs"][0]["outputs"][0]
+
+        monkeypatch.setattr(langflow_api.requests, "post", fake_post)
+        monkeypatch.setattr(langflow_api, "run_flow", fake_run_flow)
+        return calls
+
+    return serve
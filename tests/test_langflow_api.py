@@ -0,0 +1,153 @@
+"""
+Tests for parsing streamed judge output and consuming the Langflow event stream.
+"""
+from conftest import judge_message, run_result
+from langflow_api import parse_partial_scores, stream_flow
+
+JUDGE_JSON = (
+    '{"Final Score": "85/100", "Score Detail": {'
+    '"Clarity": "Says \\"great\\" a lot", "Depth": 8, "Vendors": {"DataStax": 5}}}'
+)
+FINAL_SCORES = ("85/100", {
+    "Clarity": 'Says "great" a lot',
+    "Depth": 8,
+    "Vendors": {"DataStax": 5},
+})
+
+
+def tokens(text, size=7, message_id="judge-1"):
+    """Split text into token events for the given message."""
+    return [("token", {"id": message_id, "chunk": text[i:i + size]})
+            for i in range(0, len(text), size)]
+
+
+def test_partial_number_is_not_reported_early():
+    assert parse_partial_scores('{"Final Score": 8') == ("N/A", {})
+    assert parse_partial_scores('{"Final Score": 85,') == (85, {})
+    assert parse_partial_scores('{"Final Score": 85, "Score Detail": {"Depth": 8') == (85, {})
+
+
+def test_escaped_quotes_in_values():
+    text = '{"Final Score": "85/100", "Score Detail": {"Clarity": "Says \\"great\\"", '
+    assert parse_partial_scores(text) == ("85/100", {"Clarity": 'Says "great"'})
+    assert parse_partial_scores('{"Final Score": "Says \\"hi') == ("N/A", {})
+
+
+def test_nested_detail_values():
+    text = '{"Final Score": 85, "Score Detail": {"Vendors": {"DataStax": 5}, "Depth": {"a"'
+    assert parse_partial_scores(text) == (85, {"Vendors": {"DataStax": 5}})
+
+
+def test_code_fenced_output():
+    assert parse_partial_scores(f"```json\n{JUDGE_JSON}\n```") == FINAL_SCORES
+    assert parse_partial_scores('```json\n{"Final Score": "85/100",') == ("85/100", {})
+
+
+def test_stream_yields_scores_progressively(langflow_server):
+    calls = langflow_server([
+        ("add_message", judge_message()),
+        *tokens(JUDGE_JSON),
+        ("end", {"result": run_result(JUDGE_JSON)}),
+    ])
+    results = list(stream_flow("log"))
+    assert results[0] == ("85/100", {})
+    assert results[-1] == FINAL_SCORES
+    assert len(results) > 2
+    assert calls["stream"][0]["params"] == {"stream": "true"}
+    assert calls["run_flow"] == 0
+
+
+def test_stream_ignores_tokens_of_other_messages(langflow_server):
+    other = '{"Final Score": "0/100", "Score Detail": {}}'
+    langflow_server([
+        *tokens(other, message_id="other-1"),
+        ("add_message", judge_message()),
+        *tokens(other, message_id="other-1"),
+        *tokens(JUDGE_JSON),
+        ("end", {"result": run_result(JUDGE_JSON)}),
+    ])
+    assert all(score == "85/100" for score, _ in stream_flow("log"))
+
+
+def test_stream_keeps_fenced_result_at_end(langflow_server):
+    fenced = f"```json\n{JUDGE_JSON}\n```"
+    langflow_server([
+        ("add_message", judge_message()),
+        *tokens(fenced),
+        ("end", {"result": run_result(fenced)}),
+    ])
+    assert list(stream_flow("log"))[-1] == FINAL_SCORES
+
+
+def test_stream_without_tokens_uses_judge_message(langflow_server):
+    calls = langflow_server([
+        ("add_message", {"id": "input-1", "text": "log", "properties": {}}),
+        ("add_message", judge_message(JUDGE_JSON)),
+        ("end", {"result": run_result(JUDGE_JSON)}),
+    ])
+    assert list(stream_flow("log")) == [FINAL_SCORES]
+    assert calls["run_flow"] == 0
+
+
+def test_non_event_stream_response(langflow_server):
+    calls = langflow_server(content_type="application/json", body=run_result(JUDGE_JSON))
+    assert list(stream_flow("log")) == [FINAL_SCORES]
+    assert calls["run_flow"] == 0
+
+
+def test_error_event_after_partial_results_keeps_them(langflow_server):
+    partial = JUDGE_JSON[:JUDGE_JSON.index('"Depth"')]
+    calls = langflow_server([
+        ("add_message", judge_message()),
+        *tokens(partial),
+        ("error", {"error": "model failed"}),
+    ])
+    results = list(stream_flow("log"))
+    assert results[-1] == ("85/100", {"Clarity": 'Says "great" a lot'})
+    assert calls["run_flow"] == 0
+
+
+def test_stream_closed_without_end_event(langflow_server):
+    calls = langflow_server([
+        ("add_message", judge_message()),
+        *tokens(JUDGE_JSON),
+    ])
+    assert list(stream_flow("log"))[-1] == FINAL_SCORES
+    assert calls["run_flow"] == 0
+
+
+def test_truncated_stream_keeps_partial_results(langflow_server):
+    events = [("add_message", judge_message()), *tokens(JUDGE_JSON)]
+    calls = langflow_server(events, fail_after=2 * (len(events) - 3))
+    results = list(stream_flow("log"))
+    assert results[-1][0] == "85/100"
+    assert results[-1] != FINAL_SCORES
+    assert calls["run_flow"] == 0
+
+
+def test_end_with_unparseable_judge_text(langflow_server):
+    refusal = "I cannot judge this document."
+    calls = langflow_server([
+        ("add_message", judge_message(refusal)),
+        ("end", {"result": run_result(refusal)}),
+    ])
+    assert list(stream_flow("log")) == [("N/A", {})]
+    assert calls["run_flow"] == 0
+
+
+def test_end_without_judge_output_component(langflow_server):
+    calls = langflow_server([("end", {"result": {"outputs": [{"outputs": []}]}})])
+    assert list(stream_flow("log")) == [("N/A", {})]
+    assert calls["run_flow"] == 0
+
+
+def test_falls_back_when_no_judge_output_arrives(langflow_server):
+    calls = langflow_server([("error", {"error": "flow failed"})])
+    assert list(stream_flow("log")) == [("1/100", {})]
+    assert calls["run_flow"] == 1
+
+
+def test_falls_back_when_connection_drops_first(langflow_server):
+    calls = langflow_server([("add_message", judge_message())], fail_after=0)
+    assert list(stream_flow("log")) == [("1/100", {})]
+    assert calls["run_flow"] == 1
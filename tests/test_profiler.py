@@ -0,0 +1,83 @@
+"""
+Tests for profiling calls and summarizing the profiles.
+"""
+import threading
+import time
+import pytest
+import profiler
+
+
+@pytest.fixture(autouse=True)
+def profiles_dir(tmp_path, monkeypatch):
+    """Write profiles to a temporary directory."""
+    monkeypatch.setattr(profiler, "PROFILES_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_profile_writes_tagged_outputs(profiles_dir):
+    with profiler.profile("read_file", "build log.pdf", 1024, "pdf", enabled=True) as record:
+        data = [bytes(1000) for _ in range(100)]
+    assert record["peak_memory"] >= 100_000
+    assert len(data) == 100
+    names = sorted(path.name for path in profiles_dir.iterdir())
+    assert any(name.endswith("_read_file_build_log.pdf_1024B_pdf.prof") for name in names)
+    assert any(name.endswith("_read_file_build_log.pdf_1024B_pdf.txt") for name in names)
+    [summary] = profiler.load_profile_summary(str(profiles_dir))
+    assert summary["file_name"] == "build log.pdf"
+    assert not any("tracemalloc" in line for line in summary["top_allocations"])
+
+
+def test_profile_disabled_writes_nothing(profiles_dir):
+    with profiler.profile("read_file", "log.txt", enabled=False) as record:
+        pass
+    assert record is None
+    assert not list(profiles_dir.iterdir())
+
+
+def test_profile_iter_excludes_consumer_time(profiles_dir):
+    def produce():
+        for item in range(3):
+            yield item
+
+    items = []
+    for item in profiler.profile_iter(produce(), "run_flow", "log.txt", enabled=True):
+        time.sleep(0.05)
+        items.append(item)
+    assert items == [0, 1, 2]
+    [record] = profiler.load_profile_summary(str(profiles_dir))
+    assert record["wall_time"] < 0.05
+
+
+def test_concurrent_profiles_do_not_interfere(profiles_dir):
+    errors = []
+
+    def work(name):
+        try:
+            with profiler.profile("read_file", name, enabled=True):
+                time.sleep(0.05)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(f"log{i}.txt",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(profiler.load_profile_summary(str(profiles_dir))) == 4
+
+
+def test_worst_files_uses_latest_record_per_stage():
+    records = [
+        {"stage": "read_file", "file_name": "a.pdf", "cpu_time": 5.0, "peak_memory": 10},
+        {"stage": "read_file", "file_name": "b.pdf", "cpu_time": 3.0, "peak_memory": 30},
+        {"stage": "read_file", "file_name": "a.pdf", "cpu_time": 1.0, "peak_memory": 10},
+        {"stage": "run_flow", "file_name": "a.pdf", "cpu_time": 1.0, "peak_memory": 20},
+        {"stage": "read_file", "file_name": "a.pdf", "cpu_time": 1.0, "peak_memory": 10},
+    ]
+    by_cpu = profiler.worst_files(records, 10, "cpu_time")
+    assert [entry["file_name"] for entry in by_cpu] == ["b.pdf", "a.pdf"]
+    assert by_cpu[1]["cpu_time"] == 2.0
+    assert by_cpu[1]["stages"] == ["read_file", "run_flow"]
+    by_memory = profiler.worst_files(records, 1, "peak_memory")
+    assert [entry["file_name"] for entry in by_memory] == ["b.pdf"]